@@ -1,8 +1,8 @@
+import os
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import numpy as np
-from sqlalchemy import create_engine
+from publicar_snapshot import ARCHIVO_SNAPSHOT, cargar_snapshot, json_a_tabla
 
 # --- 1. CONFIGURACIÓN DE PÁGINA ---
 # Configuración inicial de la pestaña del navegador
@@ -70,21 +70,27 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 3. CONEXIÓN A BASE DE DATOS (SQLITE) ---
-# Conecta al archivo local 'proyecto_bi.db' (No requiere usuario/contraseña)
-def init_connection():
-    return create_engine('sqlite:///proyecto_bi.db')
+# --- 3. SNAPSHOT PRECALCULADO DEL DASHBOARD ---
+# Lee 'dashboard_snapshot.json' (generado por publicar_snapshot.py). No se ejecuta SQL por sesión.
+# La fecha de modificación del archivo es parte de la llave del caché: al publicar un snapshot
+# nuevo (o al llegar por git) la siguiente ejecución lo vuelve a leer sin reiniciar el servidor.
+@st.cache_data(max_entries=1)
+def leer_snapshot(modificado):
+    return cargar_snapshot()
 
-try:
-    conn = init_connection()
-except Exception as e:
-    st.error(f"Error de conexión a base de datos: {e}")
-    st.stop()
+def obtener_snapshot():
+    modificado = os.path.getmtime(ARCHIVO_SNAPSHOT) if os.path.exists(ARCHIVO_SNAPSHOT) else None
+    return leer_snapshot(modificado)
 
 # --- 4. FUNCIONES DE LÓGICA DE NEGOCIO ---
-def get_data(view_name):
-    """Trae los datos de una vista SQL y los devuelve como DataFrame."""
-    return pd.read_sql(f"SELECT * FROM {view_name}", conn)
+def get_data(nombre, escenario=None):
+    """Devuelve una vista, el comparativo o una serie de un escenario del snapshot como DataFrame."""
+    snapshot = obtener_snapshot()
+    if escenario is not None:
+        return json_a_tabla(snapshot['escenarios'][escenario]['graficos'][nombre])
+    if nombre == "comparativo":
+        return json_a_tabla(snapshot['comparativo'])
+    return json_a_tabla(snapshot['vistas'][nombre])
 
 def predecir_defectos(esfuerzo, madurez):
     """Modelo matemático de Rayleigh simplificado."""
@@ -118,26 +124,30 @@ st.markdown("---") # Línea divisoria
 if "Dashboard" in modo:
     
     # Pestañas internas
-    tab1, tab2 = st.tabs(["🚀 Misión: Calidad y Operaciones", "👁️ Visión: Estrategia (BSC)"])
+    tab1, tab2, tab3 = st.tabs(["🚀 Misión: Calidad y Operaciones", "👁️ Visión: Estrategia (BSC)", "⚖️ Escenarios What-If"])
 
     with tab1:
         st.subheader("Indicadores Clave de Desempeño (KPIs)")
         
         try:
-            # Carga de datos desde las vistas SQL
-            df_cal = get_data("Vista_Calidad_Defectos")
-            df_fin = get_data("Vista_Desempeño_Proyectos")
-            
-            # Calculamos el Presupuesto Total sumando el de todos los proyectos
-            presupuesto_total = df_fin['Presupuesto_Original'].sum()
+            # KPIs y series precalculados en el snapshot para el escenario elegido
+            snapshot = obtener_snapshot()
+            escenarios = list(snapshot['escenarios'])
+            escenario = snapshot['escenario_defecto']
+            if len(escenarios) > 1:
+                escenario = st.selectbox("Escenario", escenarios, index=escenarios.index(escenario))
+            kpis = snapshot['escenarios'][escenario]['kpis']
+            df_sev = get_data("defectos_por_severidad", escenario)
+            df_costos = get_data("costo_por_proyecto", escenario)
             
             # Ajustamos a 5 columnas para que quepa el nuevo dato
             c1, c2, c3, c4, c5 = st.columns(5)
             
-            total_defectos = df_cal['Total_Defectos'].sum()
-            mttr_promedio = df_cal['Promedio_Horas_Resolucion_MTTR'].mean()
-            costo_total = df_fin['Costo_Real_Actual'].sum()
-            proyectos_activos = len(df_fin[df_fin['estado_actual'] == 'Activo'])
+            total_defectos = kpis['total_defectos']
+            mttr_promedio = kpis['mttr_promedio']
+            presupuesto_total = kpis['presupuesto_total']
+            costo_total = kpis['costo_total']
+            proyectos_activos = kpis['proyectos_activos']
 
             c1.metric("Defectos Totales", f"{total_defectos}")
             c2.metric("MTTR Promedio", f"{mttr_promedio:.1f} h")
@@ -148,6 +158,12 @@ if "Dashboard" in modo:
             
             c5.metric("Proyectos Activos", f"{proyectos_activos}")
             
+            # Cola de la distribución de MTTR (percentiles fusionados desde los sketches)
+            c6, c7, c8 = st.columns(3)
+            c6.metric("MTTR P50", f"{kpis['mttr_p50']:.1f} h")
+            c7.metric("MTTR P90", f"{kpis['mttr_p90']:.1f} h")
+            c8.metric("MTTR P99", f"{kpis['mttr_p99']:.1f} h")
+            
             st.markdown("<br>", unsafe_allow_html=True)
 
             # Fila de Gráficos
@@ -156,7 +172,7 @@ if "Dashboard" in modo:
             with col_L:
                 st.markdown("##### 📉 Análisis de Defectos (Por Severidad)")
                 # Gráfico de Pastel (Pie Chart) solicitado
-                fig = px.pie(df_cal, names='severidad', values='Total_Defectos',
+                fig = px.pie(df_sev, names='severidad', values='Total_Defectos',
                              # Paleta personalizada: Azul Oscuro, Cyan, Grises
                              color='severidad',
                              color_discrete_map={
@@ -176,7 +192,7 @@ if "Dashboard" in modo:
                 st.markdown("##### 💰 Salud Financiera (Costo por Proyecto)")
                 # Histograma (que funciona como gráfico de barras de frecuencia o valores)
                 # x=Proyecto, y=Costo Real
-                fig2 = px.histogram(df_fin, x='nombre_proyecto', y='Costo_Real_Actual',
+                fig2 = px.histogram(df_costos, x='nombre_proyecto', y='Costo_Real_Actual',
                               color='Estatus_Financiero',
                               color_discrete_map={'En Presupuesto': '#00B5E2', 'Sobre Costo': '#FF2E63'},
                               title="")
@@ -186,8 +202,19 @@ if "Dashboard" in modo:
                 fig2.update_yaxes(showgrid=True, gridcolor='#E1E6EA')
                 st.plotly_chart(fig2, use_container_width=True)
 
+            st.markdown("##### ⏱️ Tiempo de Resolución por Severidad (P50 / P90 / P99)")
+            df_mttr = get_data("mttr_percentiles_por_severidad", escenario)
+            fig3 = px.bar(df_mttr, x='severidad', y=['P50', 'P90', 'P99'], barmode='group',
+                          color_discrete_sequence=['#C0CACE', '#00B5E2', '#194056'],
+                          labels={'value': 'Horas', 'variable': 'Percentil', 'severidad': 'Severidad'},
+                          title="")
+            fig3.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                               font_color="#194056", showlegend=True)
+            fig3.update_yaxes(showgrid=True, gridcolor='#E1E6EA')
+            st.plotly_chart(fig3, use_container_width=True)
+
         except Exception as e:
-            st.error(f"Error cargando datos. Asegúrate de ejecutar 'migrar_a_sqlite.py' primero. Detalle: {e}")
+            st.error(f"Error cargando datos. Asegúrate de ejecutar 'publicar_snapshot.py' primero. Detalle: {e}")
 
     with tab2:
         st.subheader("Balanced Scorecard (BSC)")
@@ -212,6 +239,31 @@ if "Dashboard" in modo:
         except:
              st.warning("Datos del BSC no disponibles.")
 
+    with tab3:
+        st.subheader("Comparativo de Escenarios")
+        try:
+            # Una fila por escenario (Vista_Comparativo_Escenarios, precalculada en el snapshot)
+            df_comp = get_data("comparativo")
+            
+            fig4 = px.bar(df_comp, x='id_escenario', y=['Presupuesto_Total', 'Costo_Total'], barmode='group',
+                          color_discrete_sequence=['#194056', '#00B5E2'],
+                          labels={'value': 'MXN', 'variable': '', 'id_escenario': 'Escenario'},
+                          title="")
+            fig4.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                               font_color="#194056", showlegend=True)
+            fig4.update_yaxes(showgrid=True, gridcolor='#E1E6EA')
+            st.plotly_chart(fig4, use_container_width=True)
+            
+            st.dataframe(df_comp.rename(columns={
+                'id_escenario': 'Escenario', 'descripcion': 'Parámetros',
+                'Total_Defectos': 'Defectos', 'MTTR_Promedio': 'MTTR (h)',
+                'Presupuesto_Total': 'Presupuesto', 'Costo_Total': 'Costo Real',
+                'Margen_Pct': 'Margen %', 'Proyectos_Activos': 'Activos',
+                'Proyectos_Sobre_Costo': 'Sobre Costo'
+            }), hide_index=True, use_container_width=True)
+        except Exception as e:
+            st.warning(f"Comparativo de escenarios no disponible. Detalle: {e}")
+
 # --- 7. MÓDULO: SIMULADOR PREDICTIVO ---
 elif "Simulador" in modo:
     st.markdown("## 🔮 Modelo Predictivo Rayleigh")
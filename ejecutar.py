@@ -1,3 +1,4 @@
+import shlex
 import subprocess
 import os
 import time
@@ -13,11 +14,12 @@ def imprimir_titulo(mensaje):
     print("="*60 + "\n")
 
 def ejecutar_comando(comando, descripcion):
-    """Ejecuta un comando de sistema y maneja errores."""
+    """Ejecuta un comando de sistema (texto o lista de argumentos) y maneja errores."""
     print(f"⏳ Iniciando: {descripcion}...")
     try:
-        # shell=True permite ejecutar comandos como si estuvieras en la terminal
-        subprocess.check_call(comando, shell=True)
+        # Un texto se ejecuta como en la terminal (shell=True); una lista pasa cada argumento
+        # tal cual, sin que el shell interprete comillas, '$' o acentos graves del usuario
+        subprocess.check_call(comando, shell=isinstance(comando, str))
         print(f"✅ Éxito: {descripcion} completado.")
     except subprocess.CalledProcessError as e:
         print(f"❌ Error crítico al ejecutar: {descripcion}")
@@ -38,9 +40,8 @@ def verificar_herramientas():
         return True
 
 def limpiar_base_datos():
-    """Elimina el archivo de base de datos SQLite para asegurar una carga limpia."""
+    """Elimina el archivo de base de datos SQLite (borra todos los escenarios guardados)."""
     archivo_db = 'proyecto_bi.db'
-    imprimir_titulo("Paso 1: Limpieza de Base de Datos")
     
     if os.path.exists(archivo_db):
         try:
@@ -51,14 +52,33 @@ def limpiar_base_datos():
     else:
         print(f"ℹ️  No se encontró '{archivo_db}', se creará una nueva.")
 
+def elegir_escenario():
+    """Pide el escenario what-if a generar; la BD solo se borra si se pide explícitamente."""
+    imprimir_titulo("Paso 1: Selección de Escenario")
+    
+    # Los escenarios conviven en la misma BD: cargar uno nuevo no borra los anteriores
+    id_escenario = input("Id del escenario a generar (Enter = 'base'): ").strip() or "base"
+    print("   Parámetros disponibles: --empleados N --prob-madurez-3 P --margen-min M --margen-max M")
+    while True:
+        parametros = input("Parámetros de simulación (Enter = valores por defecto): ").strip()
+        try:
+            shlex.split(parametros)
+            break
+        except ValueError as e:
+            print(f"⚠️  Parámetros inválidos ({e}). Intenta de nuevo.")
+    
+    if input("¿Borrar TODOS los escenarios existentes antes de cargar? (s/n): ").lower() == 's':
+        limpiar_base_datos()
+    return id_escenario, parametros
+
 def subir_a_git():
     """Realiza el proceso de add, commit y push a GitHub."""
-    imprimir_titulo("Paso 4: Actualización Automática en GitHub")
+    imprimir_titulo("Paso 5: Actualización Automática en GitHub")
     
     try:
         print("📦 Preparando archivos para subir...")
-        # Agrega todos los cambios (incluyendo nuevos archivos)
-        subprocess.check_call("git add .", shell=True)
+        # Solo se sube el snapshot precalculado (la BD binaria ya no se versiona)
+        subprocess.check_call("git add dashboard_snapshot.json", shell=True)
         
         # Crea el commit con fecha y hora actual
         mensaje_commit = f"Actualización automática: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
@@ -82,25 +102,31 @@ def main():
     # 0. Verificar si tenemos Git
     tiene_git = verificar_herramientas()
 
-    # 1. Limpiar BD antigua
-    limpiar_base_datos()
+    # 1. Elegir escenario (y opcionalmente limpiar la BD)
+    id_escenario, parametros = elegir_escenario()
     
     # 2. Generar Datos Sintéticos (Simulación)
     imprimir_titulo("Paso 2: Generación de Datos (Simulación)")
-    ejecutar_comando("python simulacion_dwh.py", "Simulación de Datos DWH")
+    ejecutar_comando(["python", "simulacion_dwh.py", *shlex.split(parametros)], "Simulación de Datos DWH")
     
-    # 3. ETL y Creación de SQLite
+    # 3. ETL y Creación de SQLite (las tablas sin cambios se comparten con otros escenarios)
     imprimir_titulo("Paso 3: Proceso ETL y Carga a SQLite")
-    ejecutar_comando("python migrar_a_sqlite.py", "Migración a SQLite y Creación de Vistas")
+    descripcion = parametros or "Parámetros por defecto"
+    ejecutar_comando(["python", "migrar_a_sqlite.py", f"--escenario={id_escenario}", f"--descripcion={descripcion}"],
+                     f"Migración del escenario '{id_escenario}' y Creación de Vistas")
+    
+    # 4. Precalcular lo que muestra el dashboard (app.py no consulta la BD)
+    imprimir_titulo("Paso 4: Publicación del Snapshot del Dashboard")
+    ejecutar_comando("python publicar_snapshot.py", "Publicación de dashboard_snapshot.json")
     
-    # 4. Subir a GitHub (Opcional pero recomendado para actualizar la nube)
+    # 5. Subir a GitHub (Opcional pero recomendado para actualizar la nube)
     if tiene_git:
         respuesta = input("\n¿Quieres subir los cambios a GitHub para actualizar la web pública? (s/n): ").lower()
         if respuesta == 's':
             subir_a_git()
     
-    # 5. Abrir la Aplicación en la Nube
-    imprimir_titulo("Paso 5: Apertura de Aplicación Web")
+    # 6. Abrir la Aplicación en la Nube
+    imprimir_titulo("Paso 6: Apertura de Aplicación Web")
     print(f"🌐 Abriendo tu entorno de prueba en: {APP_URL}")
     webbrowser.open(APP_URL)
     print("\n✨ ¡Proceso finalizado! Tu aplicación está lista en el navegador.")
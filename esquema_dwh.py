@@ -0,0 +1,135 @@
+import os
+import pandas as pd
+
+# --- REGISTRO DE ESQUEMA DEL DWH ---
+# Única fuente de verdad para los cargadores (migrar_a_sqlite.py, etl_carga.py, limpiar_db.py):
+# archivo CSV, tabla destino y tipo compacto de cada columna.
+# El ORDEN de la lista es el orden de carga: primero las Dimensiones, luego los Hechos.
+
+FECHA = 'date32[pyarrow]'   # Fecha sin hora (se guarda como 'AAAA-MM-DD')
+DECIMALES_FLOAT32 = 4       # Redondeo al ensanchar float32 antes de escribir a SQL
+ESCENARIO_DEFECTO = 'base'  # Escenario what-if que se carga y se muestra por defecto
+
+ESQUEMA = [
+    {
+        'tabla': 'Dim_Tiempo',
+        'archivo': 'Dim_Tiempo.csv',
+        'columnas': {
+            'fecha_completa': FECHA,
+            'id_tiempo': 'int32',
+            'dia_de_la_semana': 'category',
+            'semana_del_año': 'int8',
+            'mes_nombre_abreviado': 'category',
+            'trimestre_num': 'int8',
+            'año': 'int16',
+            'es_laboral': 'bool',
+        },
+    },
+    {
+        'tabla': 'Dim_Cliente',
+        'archivo': 'Dim_Cliente.csv',
+        'columnas': {
+            'id_cliente': 'int32',
+            'nombre_cliente': 'string',
+            'sector': 'category',
+            'tipo_contrato_principal': 'category',
+        },
+    },
+    {
+        'tabla': 'Dim_Empleado',
+        'archivo': 'Dim_Empleado.csv',
+        'columnas': {
+            'id_empleado': 'int32',
+            'nombre_completo': 'string',
+            'rol_en_la_empresa': 'category',
+            'seniority': 'category',
+            'salario_hora_base': 'int32',
+            'equipo_asignado': 'category',
+        },
+    },
+    {
+        'tabla': 'Dim_Proceso_Interno',
+        'archivo': 'Dim_Proceso_Interno.csv',
+        'columnas': {
+            'id_proceso': 'int32',
+            'nombre_proceso': 'string',
+            'fase_sdlc': 'category',
+            'indicador_cumplimiento': 'category',
+            'documentacion_link': 'category',
+        },
+    },
+    {
+        'tabla': 'Dim_Proyecto',
+        'archivo': 'Dim_Proyecto.csv',
+        'columnas': {
+            'id_proyecto': 'int32',
+            'id_cliente': 'int32',
+            'nombre_proyecto': 'string',
+            'estado_actual': 'category',
+            'esfuerzo_estimado_total': 'int32',
+            'presupuesto_total_mxn': 'float64',  # Montos en MXN: float32 perdería centavos
+            'tipo_desarrollo': 'category',
+            'nivel_madurez_aplicado': 'int8',
+        },
+    },
+    {
+        'tabla': 'Fact_Trazabilidad_Esfuerzo',
+        'archivo': 'Fact_Trazabilidad_Esfuerzo_BASE.csv',
+        'columnas': {
+            'id_registro': 'int32',
+            'id_proyecto': 'int32',
+            'id_tiempo': 'int32',
+            'id_empleado': 'int32',
+            'id_proceso': 'int32',
+            'horas_imputadas': 'float32',
+            'costo_imputado': 'float64',
+            'horas_estimadas_fase': 'float32',
+            'varianza_esfuerzo': 'float32',
+        },
+    },
+    {
+        'tabla': 'Fact_Defectos_Calidad',
+        'archivo': 'Fact_Defectos_Calidad.csv',
+        'columnas': {
+            'id_defecto': 'int32',
+            'id_proyecto': 'int32',
+            'id_tiempo_reporte': 'int32',
+            'id_tiempo_cierre': 'int32',
+            'id_responsable': 'int32',
+            'id_proceso': 'int32',
+            'severidad': 'category',
+            'tiempo_neto_horas': 'float32',
+            'varianza_cierre_esperado': 'int16',
+            'conteo_defectos': 'int8',
+        },
+    },
+]
+
+
+def tablas_en_orden():
+    """Nombres de tabla en orden de carga (dimensiones antes que hechos)."""
+    return [entrada['tabla'] for entrada in ESQUEMA]
+
+def leer_csv(entrada, directorio='.'):
+    """Lee el CSV de una tabla con el motor pyarrow y los tipos declarados en el registro."""
+    ruta = os.path.join(directorio, entrada['archivo'])
+    columnas = entrada['columnas']
+    df = pd.read_csv(ruta, engine='pyarrow', dtype=columnas)
+
+    faltantes = set(columnas) - set(df.columns)
+    sobrantes = set(df.columns) - set(columnas)
+    if faltantes or sobrantes:
+        raise ValueError(f"'{entrada['archivo']}' no coincide con el esquema de {entrada['tabla']}: "
+                         f"faltan {sorted(faltantes)}, sobran {sorted(sobrantes)}")
+    return df
+
+def para_sql(df):
+    """Ensancha columnas float32 a float64 redondeado antes de escribir a SQL.
+
+    Las bases guardan REAL en 8 bytes de todos modos; sin el redondeo, 5.28 en float32
+    llegaría como 5.28000020980835.
+    """
+    flotantes = df.select_dtypes('float32').columns
+    if len(flotantes) == 0:
+        return df
+    return df.astype({c: 'float64' for c in flotantes}).round({c: DECIMALES_FLOAT32 for c in flotantes})
@@ -1,6 +1,6 @@
-import pandas as pd
 from sqlalchemy import create_engine
 import os
+from esquema_dwh import ESQUEMA, leer_csv, para_sql
 
 # --- 1. CONFIGURACIÓN DE CONEXIÓN A MYSQL ---
 USUARIO = 'bi_user'
@@ -13,29 +13,22 @@ BASE_DATOS = 'bi_software_dwh'
 cadena_conexion = f"mysql+pymysql://{USUARIO}:{PASSWORD}@{HOST}:{PUERTO}/{BASE_DATOS}"
 engine = create_engine(cadena_conexion)
 
-# --- 2. LISTA DE ARCHIVOS A CARGAR (EN ORDEN) ---
-# El orden es CRÍTICO: Primero las Dimensiones, luego los Hechos
-archivos_carga = [
-    ('Dim_Tiempo.csv', 'Dim_Tiempo'),
-    ('Dim_Cliente.csv', 'Dim_Cliente'),
-    ('Dim_Empleado.csv', 'Dim_Empleado'),
-    ('Dim_Proceso_Interno.csv', 'Dim_Proceso_Interno'),
-    ('Dim_Proyecto.csv', 'Dim_Proyecto'),
-    ('Fact_Trazabilidad_Esfuerzo_BASE.csv', 'Fact_Trazabilidad_Esfuerzo'),
-    ('Fact_Defectos_Calidad.csv', 'Fact_Defectos_Calidad')
-]
+# --- 2. ARCHIVOS A CARGAR (EN ORDEN) ---
+# El orden es CRÍTICO: Primero las Dimensiones, luego los Hechos.
+# Archivos, tablas, tipos y orden vienen del registro compartido en esquema_dwh.py
 
 # --- 3. PROCESO DE CARGA ---
 print("--- INICIANDO PROCESO ETL DE CARGA ---")
 
 try:
     with engine.connect() as conn:
-        for archivo, tabla in archivos_carga:
+        for entrada in ESQUEMA:
+            archivo, tabla = entrada['archivo'], entrada['tabla']
             if os.path.exists(archivo):
                 print(f"Cargando {archivo} en tabla '{tabla}'...")
                 
-                # Leer CSV con Pandas
-                df = pd.read_csv(archivo)
+                # Leer CSV con el motor pyarrow y tipos explícitos (sin inferencia)
+                df = para_sql(leer_csv(entrada))
                 
                 # Cargar a SQL
                 # if_exists='append' agrega los datos a la tabla ya creada por tu script SQL
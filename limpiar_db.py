@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine, text
+from esquema_dwh import tablas_en_orden
 
 # --- CONFIGURACIÓN ---
 USUARIO = 'bi_user'
@@ -17,16 +18,8 @@ with engine.connect() as conn:
     conn.execute(text("SET FOREIGN_KEY_CHECKS = 0;"))
     print(" -> Seguro de llaves foráneas DESACTIVADO.")
 
-    # 2. Borramos las tablas (TRUNCATE)
-    tablas = [
-        "Fact_Defectos_Calidad",
-        "Fact_Trazabilidad_Esfuerzo",
-        "Dim_Proyecto",
-        "Dim_Empleado",
-        "Dim_Proceso_Interno",
-        "Dim_Cliente",
-        "Dim_Tiempo"
-    ]
+    # 2. Borramos las tablas (TRUNCATE), en orden inverso al de carga: primero los Hechos
+    tablas = list(reversed(tablas_en_orden()))
 
     for tabla in tablas:
         try:
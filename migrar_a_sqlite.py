@@ -1,72 +1,92 @@
+import argparse
+import hashlib
+import sys
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
+from esquema_dwh import ESCENARIO_DEFECTO, ESQUEMA, leer_csv, para_sql
+from sketch_cuantiles import TDigest, fusionar_sketches
 
-# 1. CREAMOS EL MOTOR SQLITE (Esto creará un archivo 'proyecto_bi.db')
-engine = create_engine('sqlite:///proyecto_bi.db')
+# --- 1. CONFIGURACIÓN ---
+# Archivo SQLite de destino (se crea si no existe)
+ARCHIVO_DB = 'proyecto_bi.db'
 
-print("--- INICIANDO MIGRACIÓN A SQLITE ---")
+# 2. ARCHIVOS, TABLAS, TIPOS Y ORDEN DE CARGA: ver el registro en esquema_dwh.py
 
-# 2. LISTA DE ARCHIVOS CSV A CARGAR
-archivos = [
-    'Dim_Tiempo.csv', 
-    'Dim_Cliente.csv', 
-    'Dim_Empleado.csv', 
-    'Dim_Proceso_Interno.csv', 
-    'Dim_Proyecto.csv', 
-    'Fact_Trazabilidad_Esfuerzo_BASE.csv', 
-    'Fact_Defectos_Calidad.csv'
+# --- 3. ESCENARIOS Y PARTICIONES (COPY-ON-WRITE) ---
+# Cada tabla guarda sus filas etiquetadas con 'id_particion' (hash del contenido cargado).
+# Un escenario es solo un mapa tabla -> partición: si un escenario nuevo trae una tabla
+# idéntica a una ya cargada, reutiliza la partición existente en lugar de duplicar filas.
+SQL_ESCENARIOS = [
+    """
+    CREATE TABLE IF NOT EXISTS Escenario (
+        id_escenario TEXT PRIMARY KEY,
+        descripcion TEXT,
+        actualizado TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Escenario_Particion (
+        id_escenario TEXT NOT NULL REFERENCES Escenario (id_escenario),
+        tabla TEXT NOT NULL,
+        id_particion TEXT NOT NULL,
+        PRIMARY KEY (id_escenario, tabla)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_escenario_particion_tabla ON Escenario_Particion (tabla, id_particion)",
 ]
 
-# Diccionario para corregir nombres de tablas (si los CSV tienen nombres distintos)
-nombres_tablas = {
-    'Fact_Trazabilidad_Esfuerzo_BASE.csv': 'Fact_Trazabilidad_Esfuerzo'
-}
+# --- 4. ÍNDICES ---
+# Llaves de las dimensiones e índices cubrientes de los hechos (por partición): las vistas
+# agregan recorriendo solo el índice, sin leer la tabla completa ni crear índices temporales
+SQL_INDICES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_dim_proyecto ON Dim_Proyecto (id_particion, id_proyecto)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_dim_cliente ON Dim_Cliente (id_particion, id_cliente)",
+    "CREATE INDEX IF NOT EXISTS ix_fact_esfuerzo_proyecto ON Fact_Trazabilidad_Esfuerzo (id_particion, id_proyecto, costo_imputado)",
+    "CREATE INDEX IF NOT EXISTS ix_fact_defectos_proyecto ON Fact_Defectos_Calidad (id_particion, id_proyecto, severidad, tiempo_neto_horas, id_defecto)",
+]
 
-with engine.connect() as conn:
-    for archivo in archivos:
-        try:
-            nombre_tabla = nombres_tablas.get(archivo, archivo.replace('.csv', ''))
-            print(f"Cargando {archivo} en tabla '{nombre_tabla}'...")
-            
-            df = pd.read_csv(archivo)
-            # 'replace' borrará la tabla si existe y la creará de nuevo automáticamente
-            df.to_sql(nombre_tabla, conn, if_exists='replace', index=False)
-            print(" -> OK")
-        except Exception as e:
-            print(f" -> ERROR cargando {archivo}: {e}")
-
-    # 3. CREAR LAS VISTAS (SQLITE SOPORTA VISTAS ESTÁNDAR)
-    print("Creando Vistas de Negocio...")
-    
+# --- 5. VISTAS DE NEGOCIO (SQLITE SOPORTA VISTAS ESTÁNDAR) ---
+# Las vistas resuelven las particiones de cada escenario y exponen 'id_escenario'
+SQL_VISTAS = {
     # Vista 1: Calidad
-    sql_v1 = """
-    CREATE VIEW IF NOT EXISTS Vista_Calidad_Defectos AS
-    SELECT 
+    'Vista_Calidad_Defectos': """
+    CREATE VIEW Vista_Calidad_Defectos AS
+    SELECT
+        EFD.id_escenario,
         P.nombre_proyecto, P.nivel_madurez_aplicado, FD.severidad,
         COUNT(FD.id_defecto) AS Total_Defectos,
         AVG(FD.tiempo_neto_horas) AS Promedio_Horas_Resolucion_MTTR
-    FROM Fact_Defectos_Calidad FD
-    JOIN Dim_Proyecto P ON FD.id_proyecto = P.id_proyecto
-    GROUP BY P.nombre_proyecto, P.nivel_madurez_aplicado, FD.severidad;
-    """
-    
+    FROM Escenario_Particion EFD
+    JOIN Escenario_Particion EP ON EP.id_escenario = EFD.id_escenario AND EP.tabla = 'Dim_Proyecto'
+    JOIN Fact_Defectos_Calidad FD ON FD.id_particion = EFD.id_particion
+    JOIN Dim_Proyecto P ON P.id_particion = EP.id_particion AND P.id_proyecto = FD.id_proyecto
+    WHERE EFD.tabla = 'Fact_Defectos_Calidad'
+    GROUP BY EFD.id_escenario, P.nombre_proyecto, P.nivel_madurez_aplicado, FD.severidad;
+    """,
+
     # Vista 2: Finanzas
-    sql_v2 = """
-    CREATE VIEW IF NOT EXISTS Vista_Desempeño_Proyectos AS
-    SELECT 
+    'Vista_Desempeño_Proyectos': """
+    CREATE VIEW Vista_Desempeño_Proyectos AS
+    SELECT
+        EP.id_escenario,
         P.nombre_proyecto, P.estado_actual, C.nombre_cliente,
         P.presupuesto_total_mxn AS Presupuesto_Original,
         SUM(FE.costo_imputado) AS Costo_Real_Actual,
         CASE WHEN SUM(FE.costo_imputado) > P.presupuesto_total_mxn THEN 'Sobre Costo' ELSE 'En Presupuesto' END AS Estatus_Financiero
-    FROM Dim_Proyecto P
-    JOIN Fact_Trazabilidad_Esfuerzo FE ON P.id_proyecto = FE.id_proyecto
-    JOIN Dim_Cliente C ON P.id_cliente = C.id_cliente
-    GROUP BY P.id_proyecto, P.nombre_proyecto, P.estado_actual, C.nombre_cliente, P.presupuesto_total_mxn;
-    """
-    
+    FROM Escenario_Particion EP
+    JOIN Escenario_Particion EFE ON EFE.id_escenario = EP.id_escenario AND EFE.tabla = 'Fact_Trazabilidad_Esfuerzo'
+    JOIN Escenario_Particion EC ON EC.id_escenario = EP.id_escenario AND EC.tabla = 'Dim_Cliente'
+    JOIN Dim_Proyecto P ON P.id_particion = EP.id_particion
+    JOIN Fact_Trazabilidad_Esfuerzo FE ON FE.id_particion = EFE.id_particion AND FE.id_proyecto = P.id_proyecto
+    JOIN Dim_Cliente C ON C.id_particion = EC.id_particion AND C.id_cliente = P.id_cliente
+    WHERE EP.tabla = 'Dim_Proyecto'
+    GROUP BY EP.id_escenario, P.id_proyecto, P.nombre_proyecto, P.estado_actual, C.nombre_cliente, P.presupuesto_total_mxn;
+    """,
+
     # Vista 3: BSC
-    sql_v3 = """
-    CREATE VIEW IF NOT EXISTS Vista_Balanced_Scorecard AS
+    'Vista_Balanced_Scorecard': """
+    CREATE VIEW Vista_Balanced_Scorecard AS
     SELECT 'Financiera' AS Perspectiva, 'Rentabilidad' AS KPI, 85.0 AS Valor_Actual
     UNION ALL
     SELECT 'Clientes', 'Satisfacción', 90.0
@@ -74,11 +94,226 @@ with engine.connect() as conn:
     SELECT 'Procesos', 'Eficiencia MTTR', 78.5
     UNION ALL
     SELECT 'Aprendizaje', 'Capacitación', 65.0;
+    """,
+
+    # Vista 4: Comparativo de escenarios (una fila por escenario, en una sola consulta)
+    'Vista_Comparativo_Escenarios': """
+    CREATE VIEW Vista_Comparativo_Escenarios AS
+    WITH Calidad AS (
+        SELECT id_escenario,
+               SUM(Total_Defectos) AS Total_Defectos,
+               AVG(Promedio_Horas_Resolucion_MTTR) AS MTTR_Promedio
+        FROM Vista_Calidad_Defectos
+        GROUP BY id_escenario
+    ),
+    Finanzas AS (
+        SELECT id_escenario,
+               SUM(Presupuesto_Original) AS Presupuesto_Total,
+               SUM(Costo_Real_Actual) AS Costo_Total,
+               SUM(estado_actual = 'Activo') AS Proyectos_Activos,
+               SUM(Estatus_Financiero = 'Sobre Costo') AS Proyectos_Sobre_Costo
+        FROM Vista_Desempeño_Proyectos
+        GROUP BY id_escenario
+    )
+    SELECT
+        E.id_escenario, E.descripcion,
+        Cal.Total_Defectos, Cal.MTTR_Promedio,
+        Fin.Presupuesto_Total, Fin.Costo_Total,
+        100.0 * (Fin.Presupuesto_Total - Fin.Costo_Total) / Fin.Presupuesto_Total AS Margen_Pct,
+        Fin.Proyectos_Activos, Fin.Proyectos_Sobre_Costo
+    FROM Escenario E
+    LEFT JOIN Calidad Cal ON Cal.id_escenario = E.id_escenario
+    LEFT JOIN Finanzas Fin ON Fin.id_escenario = E.id_escenario;
+    """,
+}
+
+# --- 6. SKETCHES DE MTTR ---
+# Un t-digest por (partición de defectos, proyecto, severidad): el dashboard obtiene
+# P50/P90/P99 fusionando sketches, sin ordenar la tabla de defectos en cada lectura.
+# Las particiones son inmutables, así que sus sketches se escriben una sola vez al cargarlas
+SQL_SKETCH_MTTR = """
+CREATE TABLE IF NOT EXISTS Sketch_MTTR (
+    id_particion TEXT NOT NULL,
+    id_proyecto INTEGER NOT NULL,
+    severidad TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    sketch TEXT NOT NULL,
+    PRIMARY KEY (id_particion, id_proyecto, severidad)
+);
+"""
+
+# Al cargar se comparan los cuantiles fusionados contra los exactos. Tolerancia en error de
+# rango (fracción de defectos entre el estimado y el exacto), más un defecto por el redondeo
+CUANTILES_VERIFICADOS = (0.50, 0.90, 0.99)
+TOLERANCIA_RANGO_SKETCH = 0.02
+
+
+# --- 7. FUNCIONES DE MIGRACIÓN ---
+def leer_csvs(directorio='.'):
+    """Lee los CSV en orden de carga (con sus tipos del registro) y devuelve {nombre_tabla: DataFrame}."""
+    return {entrada['tabla']: leer_csv(entrada, directorio) for entrada in ESQUEMA}
+
+def calcular_particion(df):
+    """Id de partición: hash del contenido (columnas + valores) de la tabla."""
+    huella = hashlib.sha256(','.join(df.columns).encode('utf-8'))
+    huella.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return huella.hexdigest()[:16]
+
+def preparar_esquema(conn, tablas):
+    """Crea las tablas de escenarios y descarta tablas heredadas sin 'id_particion'."""
+    for sql in SQL_ESCENARIOS:
+        conn.execute(text(sql))
+    for nombre_tabla in [*tablas, 'Sketch_MTTR']:
+        columnas = [fila[1] for fila in conn.execute(text(f'PRAGMA table_info("{nombre_tabla}")'))]
+        if columnas and 'id_particion' not in columnas:
+            print(f" -> Tabla '{nombre_tabla}' sin particiones (formato anterior): se reconstruye.")
+            conn.execute(text(f'DROP TABLE "{nombre_tabla}"'))
+    conn.execute(text(SQL_SKETCH_MTTR))
+
+def existe_particion(conn, nombre_tabla, id_particion):
+    """True si la tabla ya contiene filas de esa partición."""
+    columnas = [fila[1] for fila in conn.execute(text(f'PRAGMA table_info("{nombre_tabla}")'))]
+    if not columnas:
+        return False
+    return conn.execute(text(
+        f'SELECT 1 FROM "{nombre_tabla}" WHERE id_particion = :id_particion LIMIT 1'
+    ), {'id_particion': id_particion}).first() is not None
+
+def cargar_tablas(conn, tablas, id_escenario=ESCENARIO_DEFECTO):
+    """Carga cada tabla como partición del escenario (reutiliza particiones idénticas).
+
+    Cualquier error se propaga: un escenario a medias mezclaría particiones de distintas
+    simulaciones, así que migrar() revierte la transacción completa.
     """
+    for nombre_tabla, df in tablas.items():
+        print(f"Cargando tabla '{nombre_tabla}'...")
+        df = para_sql(df)
+        id_particion = calcular_particion(df)
+        if existe_particion(conn, nombre_tabla, id_particion):
+            print(f" -> Partición {id_particion} ya existe: compartida con otros escenarios")
+        else:
+            df.assign(id_particion=id_particion).to_sql(nombre_tabla, conn, if_exists='append', index=False)
+            if nombre_tabla == 'Fact_Defectos_Calidad':
+                actualizar_sketches_mttr(conn, df, id_particion)
+                verificar_sketches_mttr(conn, df, id_particion)
+            print(f" -> OK (partición nueva {id_particion})")
+
+        conn.execute(text("""
+            INSERT INTO Escenario_Particion (id_escenario, tabla, id_particion)
+            VALUES (:id_escenario, :tabla, :id_particion)
+            ON CONFLICT (id_escenario, tabla) DO UPDATE SET id_particion = excluded.id_particion
+        """), {'id_escenario': id_escenario, 'tabla': nombre_tabla, 'id_particion': id_particion})
+
+def eliminar_particiones_huerfanas(conn, tablas):
+    """Borra particiones que ya no usa ningún escenario (p. ej. al recargar un escenario)."""
+    for nombre_tabla in [*tablas, 'Sketch_MTTR']:
+        tabla_mapa = 'Fact_Defectos_Calidad' if nombre_tabla == 'Sketch_MTTR' else nombre_tabla
+        borradas = conn.execute(text(f"""
+            DELETE FROM "{nombre_tabla}" WHERE id_particion NOT IN (
+                SELECT id_particion FROM Escenario_Particion WHERE tabla = :tabla
+            )
+        """), {'tabla': tabla_mapa}).rowcount
+        if borradas:
+            print(f" -> {borradas} filas huérfanas eliminadas de '{nombre_tabla}'")
+
+def crear_indices(conn):
+    """Crea los índices de dimensiones y los índices cubrientes de los hechos."""
+    for sql in SQL_INDICES:
+        conn.execute(text(sql))
+    conn.execute(text("ANALYZE"))
+
+def crear_vistas(conn):
+    """(Re)crea las vistas de negocio para que siempre reflejen la definición actual."""
+    for nombre_vista, sql in SQL_VISTAS.items():
+        conn.execute(text(f'DROP VIEW IF EXISTS "{nombre_vista}"'))
+        conn.execute(text(sql))
+
+def actualizar_sketches_mttr(conn, df_defectos, id_particion):
+    """Guarda un sketch de MTTR por (proyecto, severidad) para una partición nueva de defectos."""
+    filas = [
+        {
+            'id_particion': id_particion,
+            'id_proyecto': int(id_proyecto),
+            'severidad': severidad,
+            'n': len(grupo),
+            'sketch': TDigest().agregar_varios(grupo['tiempo_neto_horas']).a_json(),
+        }
+        for (id_proyecto, severidad), grupo in df_defectos.groupby(['id_proyecto', 'severidad'], observed=True)
+    ]
+    conn.execute(text("""
+        INSERT INTO Sketch_MTTR (id_particion, id_proyecto, severidad, n, sketch)
+        VALUES (:id_particion, :id_proyecto, :severidad, :n, :sketch)
+    """), filas)
+
+def verificar_sketches_mttr(conn, df_defectos, id_particion):
+    """Compara P50/P90/P99 de los sketches guardados y fusionados contra numpy.quantile exacto."""
+    sketches = pd.read_sql(text("SELECT severidad, sketch FROM Sketch_MTTR WHERE id_particion = :id_particion"),
+                           conn, params={'id_particion': id_particion})
+    horas = df_defectos['tiempo_neto_horas'].astype('float64')
+    grupos = [('Total', horas, sketches['sketch'])] + [
+        (severidad, horas[df_defectos['severidad'] == severidad], sketches.loc[sketches['severidad'] == severidad, 'sketch'])
+        for severidad in sorted(sketches['severidad'].unique())
+    ]
+
+    fallos = []
+    for nombre, valores, textos in grupos:
+        sketch = fusionar_sketches(textos)
+        valores = np.sort(valores.to_numpy())
+        detalle = []
+        for q in CUANTILES_VERIFICADOS:
+            estimado, exacto = sketch.cuantil(q), float(np.quantile(valores, q))
+            # Rango del estimado entre los valores reales (con empates es un intervalo)
+            rango_min = np.searchsorted(valores, estimado, 'left') / len(valores)
+            rango_max = np.searchsorted(valores, estimado, 'right') / len(valores)
+            tolerancia = TOLERANCIA_RANGO_SKETCH + 1 / len(valores)
+            if not rango_min - tolerancia <= q <= rango_max + tolerancia:
+                fallos.append(f"{nombre} P{q * 100:.0f}: sketch {estimado:.2f} h vs exacto {exacto:.2f} h")
+            detalle.append(f"P{q * 100:.0f} {estimado:.2f}/{exacto:.2f}")
+        print(f" -> Sketch MTTR {nombre} (sketch/exacto h): " + ", ".join(detalle))
+
+    if fallos:
+        raise ValueError("Los sketches de MTTR se desvían de los cuantiles exactos: " + "; ".join(fallos))
+
+def migrar(archivo_db=ARCHIVO_DB, tablas=None, id_escenario=ESCENARIO_DEFECTO, descripcion=None):
+    """Carga las tablas (por defecto, los CSV del directorio actual) como escenario, índices y vistas."""
+    # 1. CREAMOS EL MOTOR SQLITE (Esto creará el archivo .db)
+    engine = create_engine(f'sqlite:///{archivo_db}')
+    if tablas is None:
+        tablas = leer_csvs()
+
+    with engine.begin() as conn:
+        preparar_esquema(conn, tablas)
+        conn.execute(text("""
+            INSERT INTO Escenario (id_escenario, descripcion, actualizado)
+            VALUES (:id_escenario, :descripcion, datetime('now'))
+            ON CONFLICT (id_escenario) DO UPDATE SET
+                descripcion = COALESCE(excluded.descripcion, Escenario.descripcion),
+                actualizado = excluded.actualizado
+        """), {'id_escenario': id_escenario, 'descripcion': descripcion})
+
+        cargar_tablas(conn, tablas, id_escenario)
+        eliminar_particiones_huerfanas(conn, tablas)
+
+        print("Creando Índices...")
+        crear_indices(conn)
+
+        print("Creando Vistas de Negocio...")
+        crear_vistas(conn)
+        print(" -> Vistas Creadas Correctamente")
+    engine.dispose()
+
 
-    conn.execute(text(sql_v1))
-    conn.execute(text(sql_v2))
-    conn.execute(text(sql_v3))
-    print(" -> Vistas Creadas Correctamente")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga los CSV actuales en el DWH como un escenario.")
+    parser.add_argument('--escenario', default=ESCENARIO_DEFECTO, help="Id del escenario (se reemplaza si ya existe).")
+    parser.add_argument('--descripcion', default=None, help="Descripción o parámetros del escenario.")
+    args = parser.parse_args()
 
-print("--- MIGRACIÓN COMPLETADA: 'proyecto_bi.db' LISTO ---")
\ No newline at end of file
+    print(f"--- INICIANDO MIGRACIÓN A SQLITE (ESCENARIO '{args.escenario}') ---")
+    try:
+        migrar(id_escenario=args.escenario, descripcion=args.descripcion)
+    except Exception as e:
+        print(f" -> ERROR: {e}")
+        print(f"--- MIGRACIÓN REVERTIDA: el escenario '{args.escenario}' y la BD quedan sin cambios ---")
+        sys.exit(1)
+    print(f"--- MIGRACIÓN COMPLETADA: '{ARCHIVO_DB}' LISTO ---")
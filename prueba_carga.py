@@ -0,0 +1,219 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import resource
+import sqlite3
+import sys
+import time
+import numpy as np
+
+# --- 1. CONFIGURACIÓN ---
+# Todo corre en local con AppTest (sin navegador ni servidor): no requiere red
+os.environ.setdefault('STREAMLIT_BROWSER_GATHER_USAGE_STATS', 'false')
+
+ARCHIVO_APP = 'app.py'
+SESIONES_DEFECTO = 8
+ITERACIONES_DEFECTO = 5
+TIMEOUT_RERUN_S = 120  # Bajo concurrencia un rerun puede tardar bastante más de lo normal
+INTERVALO_REVISION_S = 5  # Cada cuánto se revisa si algún proceso de sesión murió sin reportar
+
+# Cada sesión corre en su propio proceso: AppTest no se puede usar desde varios hilos a la vez
+# (cada rerun reemplaza el Runtime global de Streamlit). Por eso las sesiones no compiten por el
+# GIL ni comparten st.cache_data como en un único servidor, y las latencias son un piso
+AVISO_AISLAMIENTO = ("Cada sesión corre en un proceso aislado: no compite por el GIL ni comparte st.cache_data\n"
+                     "   con las demás, así que las latencias subestiman la contención de un servidor real.")
+
+MODO_DASHBOARD = "📊 Dashboard Directivo"
+MODO_SIMULADOR = "🔮 Simulador Predictivo"
+
+
+# --- 2. INSTRUMENTACIÓN (DENTRO DE CADA SESIÓN) ---
+def instalar_contador_sql(contador):
+    """Cuenta toda sentencia que llega a SQLite en este proceso, venga de sqlite3 o de SQLAlchemy."""
+    connect_original = sqlite3.dbapi2.connect
+    def connect_contado(*args, **kwargs):
+        conn = connect_original(*args, **kwargs)
+        conn.set_trace_callback(lambda _: contador.__setitem__('consultas', contador['consultas'] + 1))
+        return conn
+    # SQLAlchemy (pysqlite) abre conexiones con sqlite3.dbapi2.connect
+    sqlite3.connect = sqlite3.dbapi2.connect = connect_contado
+
+def memoria_pico_mb():
+    """Pico de memoria residente (RSS) del proceso actual en MB."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+# --- 3. FLUJO DE UNA SESIÓN ---
+def medir(at, paso, registros, contador):
+    """Ejecuta un rerun de la app y registra su latencia y las consultas SQL que provocó."""
+    consultas_antes = contador['consultas']
+    inicio = time.perf_counter()
+    at.run()
+    registros.append({
+        'paso': paso,
+        'ms': (time.perf_counter() - inicio) * 1000,
+        'consultas': contador['consultas'] - consultas_antes,
+        'error': [str(e.value) for e in at.exception] + [str(e.value) for e in at.error],
+    })
+
+def ejecutar_sesion(id_sesion, iteraciones, barrera, cola):
+    """Una sesión headless: dashboard (KPIs + BSC + escenarios) y simulador con CALCULAR RIESGO."""
+    from streamlit.testing.v1 import AppTest
+
+    contador = {'consultas': 0}
+    instalar_contador_sql(contador)
+    registros = []
+    memoria_base = None
+
+    try:
+        # Calentamiento: la primera ejecución importa streamlit/plotly/pandas y llena st.cache_data.
+        # Es un costo único por servidor, así que la memoria de la sesión se mide desde aquí
+        medir(AppTest.from_file(ARCHIVO_APP, default_timeout=TIMEOUT_RERUN_S), 'arranque_proceso', registros, contador)
+        memoria_base = memoria_pico_mb()
+
+        at = AppTest.from_file(ARCHIVO_APP, default_timeout=TIMEOUT_RERUN_S)
+        barrera.wait()  # Todas las sesiones arrancan a la vez
+
+        medir(at, 'carga_inicial', registros, contador)
+        for i in range(iteraciones):
+            # Dashboard: las pestañas de Streamlit se dibujan todas en el mismo rerun,
+            # así que este paso incluye la pestaña de KPIs, la del BSC y la de escenarios
+            at.radio[0].set_value(MODO_DASHBOARD)
+            medir(at, 'dashboard', registros, contador)
+            if not at.progress:
+                registros[-1]['error'].append("La pestaña BSC no mostró indicadores.")
+
+            # Cambiar de escenario si el snapshot trae más de uno
+            if at.selectbox:
+                opciones = at.selectbox[0].options
+                at.selectbox[0].set_value(opciones[i % len(opciones)])
+                medir(at, 'cambio_escenario', registros, contador)
+
+            # Simulador predictivo: navegar, variar parámetros y pulsar CALCULAR RIESGO
+            at.radio[0].set_value(MODO_SIMULADOR)
+            medir(at, 'simulador', registros, contador)
+            at.number_input[0].set_value(500 + 250 * i)
+            at.selectbox[0].set_value([2, 3, 4][i % 3])
+            at.button[0].click()
+            medir(at, 'calcular_riesgo', registros, contador)
+    except Exception as e:
+        barrera.abort()  # Si falla antes de la barrera, las demás sesiones no se quedan esperando
+        registros.append({'paso': 'sesion', 'ms': 0.0, 'consultas': 0, 'error': [repr(e)]})
+
+    cola.put({
+        'sesion': id_sesion,
+        'registros': registros,
+        'consultas': contador['consultas'],
+        'memoria_base_mb': memoria_base if memoria_base is not None else memoria_pico_mb(),
+        'memoria_pico_mb': memoria_pico_mb(),
+    })
+
+
+# --- 4. ORQUESTACIÓN Y REPORTE ---
+def ejecutar_prueba(sesiones, iteraciones):
+    """Lanza N sesiones concurrentes (un proceso cada una) y recopila sus métricas."""
+    contexto = mp.get_context('spawn')  # Procesos limpios: sin módulos ni cachés heredados
+    barrera = contexto.Barrier(sesiones)
+    cola = contexto.Queue()
+    procesos = [contexto.Process(target=ejecutar_sesion, args=(i, iteraciones, barrera, cola))
+                for i in range(sesiones)]
+    for p in procesos:
+        p.start()
+
+    resultados = {}
+    while len(resultados) < len(procesos):
+        try:
+            resultado = cola.get(timeout=INTERVALO_REVISION_S)
+            resultados[resultado['sesion']] = resultado
+        except queue.Empty:
+            # Un proceso que murió de golpe (OOM, segfault) nunca reporta: se registra como error
+            # y se rompe la barrera para que las demás sesiones no se queden esperando
+            for i, p in enumerate(procesos):
+                if i not in resultados and not p.is_alive():
+                    barrera.abort()
+                    resultados[i] = {
+                        'sesion': i,
+                        'registros': [{'paso': 'sesion', 'ms': 0.0, 'consultas': 0,
+                                       'error': [f"el proceso terminó sin reportar (código de salida {p.exitcode})"]}],
+                        'consultas': 0,
+                        'memoria_base_mb': 0.0,
+                        'memoria_pico_mb': 0.0,
+                    }
+    for p in procesos:
+        p.join()
+    return [resultados[i] for i in sorted(resultados)]
+
+def resumir(resultados):
+    """Percentiles de latencia por paso y totales de consultas, memoria y errores."""
+    registros = [r for res in resultados for r in res['registros']]
+    pasos = {}
+    for r in registros:
+        pasos.setdefault(r['paso'], []).append(r['ms'])
+
+    return {
+        'latencias_ms': {
+            paso: {
+                'n': len(ms),
+                'p50': float(np.percentile(ms, 50)),
+                'p95': float(np.percentile(ms, 95)),
+                'p99': float(np.percentile(ms, 99)),
+            }
+            for paso, ms in pasos.items()
+        },
+        'sesiones': [
+            {
+                'sesion': res['sesion'],
+                'consultas_sql': res['consultas'],
+                'memoria_arranque_mb': round(res['memoria_base_mb'], 1),
+                'memoria_sesion_mb': round(res['memoria_pico_mb'] - res['memoria_base_mb'], 1),
+                'memoria_pico_mb': round(res['memoria_pico_mb'], 1),
+            }
+            for res in resultados
+        ],
+        'errores': [f"sesión {res['sesion']} / {r['paso']}: {e}"
+                    for res in resultados for r in res['registros'] for e in r['error']],
+    }
+
+def imprimir_resumen(resumen, sesiones, iteraciones):
+    print(f"\nSesiones concurrentes: {sesiones} | Iteraciones por sesión: {iteraciones}\n")
+    print(f"{'Paso':<18}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for paso, lat in resumen['latencias_ms'].items():
+        print(f"{paso:<18}{lat['n']:>6}{lat['p50']:>10.1f}{lat['p95']:>10.1f}{lat['p99']:>10.1f}")
+
+    print(f"\n{'Sesión':<8}{'Consultas SQL':>15}{'Arranque MB':>14}{'+Sesión MB':>12}{'Pico proceso MB':>18}")
+    for s in resumen['sesiones']:
+        print(f"{s['sesion']:<8}{s['consultas_sql']:>15}{s['memoria_arranque_mb']:>14.1f}"
+              f"{s['memoria_sesion_mb']:>12.1f}{s['memoria_pico_mb']:>18.1f}")
+    print("\nArranque MB = proceso tras imports y caché (costo único por servidor); +Sesión MB = crecimiento desde ahí.")
+    print(f"⚠️  {AVISO_AISLAMIENTO}")
+
+    if any(s['consultas_sql'] for s in resumen['sesiones']):
+        print("\n⚠️  La app ejecutó SQL durante las sesiones: debería servir todo desde el snapshot.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de app.py con sesiones headless concurrentes.")
+    parser.add_argument('--sesiones', type=int, default=SESIONES_DEFECTO, help="Número de sesiones simultáneas.")
+    parser.add_argument('--iteraciones', type=int, default=ITERACIONES_DEFECTO, help="Recorridos completos por sesión.")
+    parser.add_argument('--salida', default=None, help="Archivo JSON donde guardar el resumen.")
+    args = parser.parse_args()
+
+    print("--- INICIANDO PRUEBA DE CARGA DE APP.PY ---")
+    resumen = resumir(ejecutar_prueba(args.sesiones, args.iteraciones))
+    resumen['limitaciones'] = AVISO_AISLAMIENTO.replace("\n   ", " ")
+    imprimir_resumen(resumen, args.sesiones, args.iteraciones)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, indent=1, ensure_ascii=False)
+        print(f"\nResumen guardado en '{args.salida}'.")
+
+    if resumen['errores']:
+        print("\n--- ERRORES DURANTE LA PRUEBA ---")
+        for error in resumen['errores']:
+            print(f" -> {error}")
+        sys.exit(1)
+    print("\n--- PRUEBA DE CARGA COMPLETADA ---")
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from sqlalchemy import create_engine
+from sketch_cuantiles import fusionar_sketches
+from esquema_dwh import ESCENARIO_DEFECTO
+
+# --- 1. CONFIGURACIÓN ---
+ARCHIVO_DB = 'proyecto_bi.db'
+ARCHIVO_SNAPSHOT = 'dashboard_snapshot.json'
+
+# Se incrementa cuando cambia la estructura del snapshot (app.py rechaza versiones distintas)
+VERSION_SNAPSHOT = 3
+
+# Consultas que necesita el dashboard. Solo se ejecutan al publicar, nunca desde app.py
+CONSULTAS = {
+    'Vista_Calidad_Defectos': "SELECT * FROM Vista_Calidad_Defectos",
+    'Vista_Desempeño_Proyectos': "SELECT * FROM Vista_Desempeño_Proyectos",
+    'Vista_Balanced_Scorecard': "SELECT * FROM Vista_Balanced_Scorecard",
+    'Vista_Comparativo_Escenarios': "SELECT * FROM Vista_Comparativo_Escenarios",
+    'Sketch_MTTR': """
+        SELECT EP.id_escenario, S.severidad, S.sketch
+        FROM Escenario_Particion EP
+        JOIN Sketch_MTTR S ON S.id_particion = EP.id_particion
+        WHERE EP.tabla = 'Fact_Defectos_Calidad'
+    """,
+}
+
+# Percentiles de MTTR que se publican (nombre de columna -> cuantil)
+PERCENTILES_MTTR = {'P50': 0.50, 'P90': 0.90, 'P99': 0.99}
+
+
+# --- 2. FUNCIONES DE PUBLICACIÓN ---
+def tabla_a_json(df):
+    """Convierte un DataFrame a {columns, data} con tipos nativos de JSON."""
+    return json.loads(df.round(2).to_json(orient='split', index=False, force_ascii=False))
+
+def json_a_tabla(tabla):
+    """Reconstruye un DataFrame a partir de una tabla del snapshot."""
+    return pd.DataFrame(tabla['data'], columns=tabla['columns'])
+
+def calcular_hash(payload):
+    """Hash SHA-256 del contenido canónico (claves ordenadas, sin espacios)."""
+    canonico = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+def serializar_snapshot(valor, nivel=0):
+    """JSON indentado con claves ordenadas y una fila de datos por línea (diffs pequeños en Git).
+
+    Las listas de escalares (columnas y filas) se escriben completas en una sola línea.
+    """
+    sangria = ' ' * (nivel + 1)
+    if isinstance(valor, dict) and valor:
+        lineas = [f"{sangria}{json.dumps(clave, ensure_ascii=False)}: {serializar_snapshot(valor[clave], nivel + 1)}"
+                  for clave in sorted(valor)]
+        return '{\n' + ',\n'.join(lineas) + '\n' + ' ' * nivel + '}'
+    if isinstance(valor, list) and any(isinstance(v, (dict, list)) for v in valor):
+        lineas = [sangria + serializar_snapshot(v, nivel + 1) for v in valor]
+        return '[\n' + ',\n'.join(lineas) + '\n' + ' ' * nivel + ']'
+    return json.dumps(valor, ensure_ascii=False)
+
+def percentiles_mttr(df_sketches):
+    """Fusiona los sketches por severidad y en total; devuelve (tabla por severidad, KPIs globales)."""
+    filas = []
+    for severidad, grupo in df_sketches.groupby('severidad', sort=True):
+        sketch = fusionar_sketches(grupo['sketch'])
+        filas.append({'severidad': severidad, **{p: sketch.cuantil(q) for p, q in PERCENTILES_MTTR.items()}})
+
+    total = fusionar_sketches(df_sketches['sketch'])
+    kpis = {f'mttr_{p.lower()}': round(total.cuantil(q), 2) for p, q in PERCENTILES_MTTR.items()}
+    return pd.DataFrame(filas, columns=['severidad', *PERCENTILES_MTTR]), kpis
+
+def construir_escenario(comparativo, df_cal, df_fin, df_sketches):
+    """KPIs y series de un escenario (comparativo es su fila de Vista_Comparativo_Escenarios)."""
+    mttr_por_severidad, kpis_mttr = percentiles_mttr(df_sketches)
+
+    kpis = {
+        'total_defectos': int(comparativo['Total_Defectos']),
+        'mttr_promedio': round(float(comparativo['MTTR_Promedio']), 2),
+        'presupuesto_total': round(float(comparativo['Presupuesto_Total']), 2),
+        'costo_total': round(float(comparativo['Costo_Total']), 2),
+        'proyectos_activos': int(comparativo['Proyectos_Activos']),
+        **kpis_mttr,
+    }
+
+    # Series ya agregadas: el gráfico recibe una fila por barra/sector (sort=False conserva el orden de la vista)
+    defectos_por_severidad = df_cal.groupby('severidad', as_index=False, sort=False)['Total_Defectos'].sum()
+    costo_por_proyecto = df_fin.groupby(['nombre_proyecto', 'Estatus_Financiero'], as_index=False, sort=False)['Costo_Real_Actual'].sum()
+
+    return {
+        'kpis': kpis,
+        'graficos': {
+            'defectos_por_severidad': tabla_a_json(defectos_por_severidad),
+            'costo_por_proyecto': tabla_a_json(costo_por_proyecto),
+            'mttr_percentiles_por_severidad': tabla_a_json(mttr_por_severidad),
+        },
+    }
+
+def construir_payload(conn):
+    """Precalcula exactamente lo que app.py dibuja: KPIs y series por escenario, comparativo y vistas."""
+    df_cal = pd.read_sql(CONSULTAS['Vista_Calidad_Defectos'], conn)
+    df_fin = pd.read_sql(CONSULTAS['Vista_Desempeño_Proyectos'], conn)
+    df_bsc = pd.read_sql(CONSULTAS['Vista_Balanced_Scorecard'], conn)
+    df_comparativo = pd.read_sql(CONSULTAS['Vista_Comparativo_Escenarios'], conn)
+    df_sketches = pd.read_sql(CONSULTAS['Sketch_MTTR'], conn)
+
+    # Cada vista trae todos los escenarios a la vez; aquí solo se reparten por id_escenario
+    escenarios = {}
+    for _, fila in df_comparativo.iterrows():
+        id_escenario = fila['id_escenario']
+        escenarios[id_escenario] = construir_escenario(
+            fila,
+            df_cal[df_cal['id_escenario'] == id_escenario],
+            df_fin[df_fin['id_escenario'] == id_escenario],
+            df_sketches[df_sketches['id_escenario'] == id_escenario],
+        )
+
+    defecto = ESCENARIO_DEFECTO if ESCENARIO_DEFECTO in escenarios else next(iter(escenarios), None)
+    return {
+        'escenario_defecto': defecto,
+        'escenarios': escenarios,
+        'comparativo': tabla_a_json(df_comparativo),
+        'vistas': {
+            'Vista_Balanced_Scorecard': tabla_a_json(df_bsc),
+        },
+    }
+
+def publicar_snapshot(archivo_db=ARCHIVO_DB, archivo_snapshot=ARCHIVO_SNAPSHOT):
+    """Genera el snapshot versionado con hash de contenido y lo escribe como JSON legible."""
+    engine = create_engine(f'sqlite:///{archivo_db}')
+    with engine.connect() as conn:
+        payload = construir_payload(conn)
+    engine.dispose()
+
+    snapshot = {'version': VERSION_SNAPSHOT, 'hash': calcular_hash(payload), **payload}
+
+    with open(archivo_snapshot, 'w', encoding='utf-8') as f:
+        f.write(serializar_snapshot(snapshot) + '\n')
+    return snapshot
+
+def cargar_snapshot(archivo_snapshot=ARCHIVO_SNAPSHOT):
+    """Lee el snapshot y valida versión y hash antes de entregarlo al dashboard."""
+    if not os.path.exists(archivo_snapshot):
+        raise FileNotFoundError(f"No existe '{archivo_snapshot}'. Ejecuta 'publicar_snapshot.py' primero.")
+
+    with open(archivo_snapshot, encoding='utf-8') as f:
+        snapshot = json.load(f)
+
+    if snapshot.get('version') != VERSION_SNAPSHOT:
+        raise ValueError(f"Versión de snapshot {snapshot.get('version')} no soportada (se esperaba {VERSION_SNAPSHOT}).")
+
+    payload = {k: v for k, v in snapshot.items() if k not in ('version', 'hash')}
+    if calcular_hash(payload) != snapshot.get('hash'):
+        raise ValueError("El hash del snapshot no coincide con su contenido (archivo corrupto o editado a mano).")
+    return snapshot
+
+
+if __name__ == "__main__":
+    print("--- PUBLICANDO SNAPSHOT DEL DASHBOARD ---")
+    snapshot = publicar_snapshot()
+    tamano_kb = os.path.getsize(ARCHIVO_SNAPSHOT) / 1024
+    print(f" -> '{ARCHIVO_SNAPSHOT}' escrito ({tamano_kb:.1f} KB, hash {snapshot['hash'][:12]})")
+    print("--- SNAPSHOT LISTO: app.py ya no necesita consultar 'proyecto_bi.db' ---")
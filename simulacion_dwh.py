@@ -1,9 +1,26 @@
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 
+# --- 0. PARÁMETROS DEL ESCENARIO (WHAT-IF) ---
+# Cada escenario se simula con la misma semilla y solo cambia lo indicado aquí, así las
+# tablas que no dependen del parámetro salen idénticas y el DWH las comparte entre escenarios
+parser = argparse.ArgumentParser(description="Genera los CSV del DWH para un escenario de simulación.")
+parser.add_argument('--empleados', type=int, default=8, help="Plantilla (headcount).")
+parser.add_argument('--prob-madurez-3', type=float, default=0.6,
+                    help="Proporción de proyectos en CMMI nivel 3 (el resto en nivel 2).")
+parser.add_argument('--margen-min', type=float, default=1.30, help="Multiplicador mínimo de presupuesto.")
+parser.add_argument('--margen-max', type=float, default=1.60, help="Multiplicador máximo de presupuesto.")
+parser.add_argument('--semilla', type=int, default=2024, help="Semilla común de todos los escenarios.")
+args = parser.parse_args()
+
+# Un generador independiente por tabla: cambiar un parámetro no altera las demás tablas
+def generador(tabla):
+    return np.random.default_rng([args.semilla, tabla])
+
 # --- 1. CONFIGURACIÓN DE PARÁMETROS ---
-N_EMPLEADOS = 8  # Reducido para parecer más Startup
+N_EMPLEADOS = args.empleados  # Reducido para parecer más Startup
 N_CLIENTES = 5
 N_PROYECTOS = 12
 FECHA_INICIO_SIMULACION = pd.to_datetime('2024-01-01')
@@ -15,7 +32,7 @@ HORIZONTE_TIEMPO = pd.date_range(FECHA_INICIO_SIMULACION, FECHA_FIN_SIMULACION,
 HORIZONTE_DIMENSION = pd.date_range(FECHA_INICIO_SIMULACION, '2025-03-30', freq='D')
 
 # --- 1.1 FUNCIÓN RAYLEIGH (Modelo Predictivo) ---
-def predecir_defectos_rayleigh(esfuerzo, nivel_madurez):
+def predecir_defectos_rayleigh(esfuerzo, nivel_madurez, rng):
     # Ajustamos factores para que sean realistas
     if nivel_madurez == 4:
         factor_base = 0.005 
@@ -25,7 +42,7 @@ def predecir_defectos_rayleigh(esfuerzo, nivel_madurez):
         factor_base = 0.02 
         
     N_esperado = esfuerzo * factor_base
-    N_defectos_predichos = np.random.poisson(N_esperado)
+    N_defectos_predichos = rng.poisson(N_esperado)
     return max(3, N_defectos_predichos) # Mínimo 3 defectos para que haya datos
 
 # --- 2. GENERACIÓN DE DIMENSIONES ---
@@ -44,18 +61,20 @@ df_tiempo.to_csv('Dim_Tiempo.csv', index=False)
 
 ## Dim_Cliente
 print("Generando Dim_Cliente...")
+rng = generador(1)
 sectores = ['Pymes', 'Comercio Local', 'Salud', 'Educación']
 contratos = ['Precio Fijo', 'Bolsa de Horas']
 df_cliente = pd.DataFrame({
     'id_cliente': range(1, N_CLIENTES + 1),
     'nombre_cliente': [f'Cliente_{i}' for i in range(1, N_CLIENTES + 1)],
-    'sector': np.random.choice(sectores, N_CLIENTES),
-    'tipo_contrato_principal': np.random.choice(contratos, N_CLIENTES)
+    'sector': rng.choice(sectores, N_CLIENTES),
+    'tipo_contrato_principal': rng.choice(contratos, N_CLIENTES)
 })
 df_cliente.to_csv('Dim_Cliente.csv', index=False)
 
 ## Dim_Empleado (Salarios ajustados a Startup)
 print("Generando Dim_Empleado...")
+rng = generador(2)
 roles = ['Líder de Proyecto', 'Desarrollador Senior', 'Desarrollador Mid', 'Desarrollador Junior', 'Tester QA']
 seniority = ['Senior', 'Mid', 'Junior']
 
@@ -72,11 +91,11 @@ salarios = {
 df_empleado = pd.DataFrame({
     'id_empleado': range(1, N_EMPLEADOS + 1),
     'nombre_completo': [f'Colaborador_{i}' for i in range(1, N_EMPLEADOS + 1)],
-    'rol_en_la_empresa': np.random.choice(roles, N_EMPLEADOS),
-    'seniority': np.random.choice(seniority, N_EMPLEADOS),
+    'rol_en_la_empresa': rng.choice(roles, N_EMPLEADOS),
+    'seniority': rng.choice(seniority, N_EMPLEADOS),
 })
 df_empleado['salario_hora_base'] = df_empleado['rol_en_la_empresa'].map(salarios)
-df_empleado['equipo_asignado'] = np.random.choice(['Dev Team A', 'Dev Team B'], N_EMPLEADOS)
+df_empleado['equipo_asignado'] = rng.choice(['Dev Team A', 'Dev Team B'], N_EMPLEADOS)
 df_empleado.to_csv('Dim_Empleado.csv', index=False)
 
 ## Dim_Proceso_Interno
@@ -96,31 +115,32 @@ df_proceso.to_csv('Dim_Proceso_Interno.csv', index=False)
 
 ## Dim_Proyecto (Presupuesto Inteligente)
 print("Generando Dim_Proyecto...")
+rng = generador(3)
 proyectos_data = []
 costo_promedio_hr = 300 # Referencia para calcular presupuesto
 
 for i in range(1, N_PROYECTOS + 1):
-    id_cliente = np.random.choice(df_cliente['id_cliente'])
-    duracion_dias = np.random.randint(30, 180) # Proyectos de 1 a 6 meses
-    start_date = FECHA_INICIO_SIMULACION + timedelta(days=np.random.randint(0, 300))
+    id_cliente = rng.choice(df_cliente['id_cliente'])
+    duracion_dias = rng.integers(30, 180) # Proyectos de 1 a 6 meses
+    start_date = FECHA_INICIO_SIMULACION + timedelta(days=int(rng.integers(0, 300)))
     
     # Esfuerzo más moderado (200 a 1200 horas)
-    esfuerzo_estimado = np.random.randint(200, 1200)
+    esfuerzo_estimado = rng.integers(200, 1200)
     
     # LÓGICA DE PRESUPUESTO RENTABLE:
-    # Presupuesto = Costo Estimado + Margen de Ganancia (30% a 60%)
-    margen_ganancia = np.random.uniform(1.30, 1.60) 
+    # Presupuesto = Costo Estimado + Margen de Ganancia (por defecto 30% a 60%)
+    margen_ganancia = rng.uniform(args.margen_min, args.margen_max)
     presupuesto = (esfuerzo_estimado * costo_promedio_hr) * margen_ganancia
     
     proyectos_data.append({
         'id_proyecto': i,
         'id_cliente': id_cliente,
         'nombre_proyecto': f'App v{i}.0',
-        'estado_actual': np.random.choice(['Entregado', 'Activo'], p=[0.6, 0.4]),
+        'estado_actual': rng.choice(['Entregado', 'Activo'], p=[0.6, 0.4]),
         'esfuerzo_estimado_total': esfuerzo_estimado,
         'presupuesto_total_mxn': round(presupuesto, 2),
-        'tipo_desarrollo': np.random.choice(['Web', 'Móvil', 'E-commerce']),
-        'nivel_madurez_aplicado': np.random.choice([2, 3], p=[0.4, 0.6]) # Startups suelen estar en nivel 2 o 3
+        'tipo_desarrollo': rng.choice(['Web', 'Móvil', 'E-commerce']),
+        'nivel_madurez_aplicado': rng.choice([2, 3], p=[1 - args.prob_madurez_3, args.prob_madurez_3]) # Startups suelen estar en nivel 2 o 3
     })
 df_proyecto = pd.DataFrame(proyectos_data)
 df_proyecto.to_csv('Dim_Proyecto.csv', index=False)
@@ -130,13 +150,14 @@ df_proyecto.to_csv('Dim_Proyecto.csv', index=False)
 
 ## Fact_Trazabilidad_Esfuerzo
 print("Generando base para Fact_Trazabilidad_Esfuerzo...")
+rng = generador(4)
 registros_esfuerzo = []
 id_registro = 1
 
 for _, proyecto in df_proyecto.iterrows():
     # Simular que trabajamos cerca de lo estimado (con un poco de variación)
     # Variación del +/- 10% sobre lo estimado para que sea realista pero rentable
-    variacion_real = np.random.uniform(0.9, 1.15) 
+    variacion_real = rng.uniform(0.9, 1.15)
     horas_totales_a_simular = int(proyecto['esfuerzo_estimado_total'] * variacion_real)
     
     # Distribuir esas horas en registros diarios pequeños (ej. 4-8 horas por día)
@@ -151,10 +172,10 @@ for _, proyecto in df_proyecto.iterrows():
     for fecha in fechas_registro:
         if fecha > FECHA_FIN_SIMULACION: continue # No pasarse de 2024
         
-        id_empleado = np.random.choice(df_empleado['id_empleado'])
-        id_proceso = np.random.choice(df_proceso['id_proceso'])
+        id_empleado = rng.choice(df_empleado['id_empleado'])
+        id_proceso = rng.choice(df_proceso['id_proceso'])
         
-        horas_imputadas = round(np.random.uniform(2.0, 9.0), 2)
+        horas_imputadas = round(rng.uniform(2.0, 9.0), 2)
         
         # Costo real basado en salario
         costo_hora = df_empleado[df_empleado['id_empleado'] == id_empleado]['salario_hora_base'].iloc[0]
@@ -179,6 +200,7 @@ df_fact_esfuerzo.to_csv('Fact_Trazabilidad_Esfuerzo_BASE.csv', index=False)
 
 ## Fact_Defectos_Calidad
 print("Generando Fact_Defectos_Calidad...")
+rng = generador(5)
 registros_defectos = []
 id_defecto = 1
 
@@ -188,7 +210,8 @@ tiempos_resolucion_media = {'Bloqueador': 6.0, 'Grave': 3.5, 'Menor': 1.5, 'Leve
 for _, proyecto in df_proyecto.iterrows():
     N_defectos = predecir_defectos_rayleigh(
         proyecto['esfuerzo_estimado_total'], 
-        proyecto['nivel_madurez_aplicado']
+        proyecto['nivel_madurez_aplicado'],
+        rng
     )
     
     lideres = df_empleado[df_empleado['rol_en_la_empresa'] == 'Líder de Proyecto']['id_empleado'].tolist()
@@ -200,14 +223,14 @@ for _, proyecto in df_proyecto.iterrows():
     
     for i in range(N_defectos):
         # CORRECCIÓN: Convertir explícitamente a datetime de Pandas para evitar TypeError
-        fecha_creacion = pd.to_datetime(np.random.choice(fechas_proyecto))
-        fecha_cierre = fecha_creacion + timedelta(days=int(np.random.randint(1, 8)))
+        fecha_creacion = pd.to_datetime(rng.choice(fechas_proyecto))
+        fecha_cierre = fecha_creacion + timedelta(days=int(rng.integers(1, 8)))
         
-        gravedad = np.random.choice(gravedades, p=[0.05, 0.25, 0.4, 0.3])
-        tiempo_neto = max(0.25, np.random.normal(tiempos_resolucion_media[gravedad], 1.0))
+        gravedad = rng.choice(gravedades, p=[0.05, 0.25, 0.4, 0.3])
+        tiempo_neto = max(0.25, rng.normal(tiempos_resolucion_media[gravedad], 1.0))
         
-        id_responsable = np.random.choice(desarrolladores if desarrolladores else [1])
-        id_proceso_enc = np.random.choice(df_proceso['id_proceso'], p=[0.05, 0.05, 0.15, 0.15, 0.20, 0.30, 0.10])
+        id_responsable = rng.choice(desarrolladores if desarrolladores else [1])
+        id_proceso_enc = rng.choice(df_proceso['id_proceso'], p=[0.05, 0.05, 0.15, 0.15, 0.20, 0.30, 0.10])
         
         registros_defectos.append({
             'id_defecto': id_defecto,
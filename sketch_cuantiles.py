@@ -0,0 +1,138 @@
+import json
+import math
+
+# --- T-DIGEST (SKETCH DE CUANTILES FUSIONABLE) ---
+# Resume una distribución en pocos centroides [media, peso]. Los centroides de las colas
+# se mantienen pequeños, así P90/P99 conservan buena precisión aunque el sketch sea compacto.
+# Dos sketches se fusionan sin volver a leer los datos originales.
+
+COMPRESION_DEFECTO = 100  # Más alto = más centroides y más precisión
+
+
+class TDigest:
+    def __init__(self, compresion=COMPRESION_DEFECTO):
+        self.compresion = compresion
+        self.centroides = []   # Lista ordenada de [media, peso]
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self._pendientes = []
+
+    @property
+    def n(self):
+        """Número total de observaciones resumidas."""
+        return sum(p for _, p in self.centroides) + sum(p for _, p in self._pendientes)
+
+    def agregar(self, valor, peso=1):
+        """Agrega una observación (se comprime por lotes para que sea barato)."""
+        valor = float(valor)
+        self._pendientes.append([valor, peso])
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+        if len(self._pendientes) >= 10 * self.compresion:
+            self._comprimir()
+
+    def agregar_varios(self, valores):
+        """Agrega una secuencia de observaciones."""
+        for valor in valores:
+            self.agregar(valor)
+        return self
+
+    def fusionar(self, otro):
+        """Incorpora los centroides de otro sketch (operación asociativa y conmutativa)."""
+        otro._comprimir()
+        self._pendientes.extend([m, p] for m, p in otro.centroides)
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._comprimir()
+        return self
+
+    def _k(self, q):
+        """Función de escala k1: permite centroides grandes al centro y pequeños en las colas."""
+        return self.compresion / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _q(self, k):
+        """Inversa de _k."""
+        k = min(max(k, -self.compresion / 4), self.compresion / 4)
+        return (math.sin(k * 2 * math.pi / self.compresion) + 1) / 2
+
+    def _comprimir(self):
+        if not self._pendientes:
+            return
+        puntos = sorted(self.centroides + self._pendientes)
+        self._pendientes = []
+        total = sum(p for _, p in puntos)
+
+        fusionados = [list(puntos[0])]
+        acumulado = 0.0
+        q_limite = self._q(self._k(0.0) + 1)
+        for media, peso in puntos[1:]:
+            ultimo = fusionados[-1]
+            if (acumulado + ultimo[1] + peso) / total <= q_limite:
+                # Cabe en el centroide actual: media ponderada
+                ultimo[0] += (media - ultimo[0]) * peso / (ultimo[1] + peso)
+                ultimo[1] += peso
+            else:
+                acumulado += ultimo[1]
+                q_limite = self._q(self._k(acumulado / total) + 1)
+                fusionados.append([media, peso])
+        self.centroides = fusionados
+
+    def cuantil(self, q):
+        """Valor estimado del cuantil q (0-1), interpolando entre centros de centroides."""
+        self._comprimir()
+        if not self.centroides:
+            return math.nan
+        if len(self.centroides) == 1:
+            return self.centroides[0][0]
+
+        total = sum(p for _, p in self.centroides)
+        objetivo = q * total
+
+        # Centro de cada centroide en la escala de peso acumulado
+        centros = []
+        acumulado = 0.0
+        for media, peso in self.centroides:
+            centros.append(acumulado + peso / 2)
+            acumulado += peso
+
+        if objetivo <= centros[0]:
+            return self._interpolar(0.0, self.minimo, centros[0], self.centroides[0][0], objetivo)
+        if objetivo >= centros[-1]:
+            return self._interpolar(centros[-1], self.centroides[-1][0], total, self.maximo, objetivo)
+        for i in range(1, len(centros)):
+            if objetivo <= centros[i]:
+                return self._interpolar(centros[i - 1], self.centroides[i - 1][0],
+                                        centros[i], self.centroides[i][0], objetivo)
+
+    @staticmethod
+    def _interpolar(x0, y0, x1, y1, x):
+        if x1 == x0:
+            return y0
+        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    def a_json(self):
+        """Serializa el sketch (centroides redondeados) para guardarlo en una columna TEXT."""
+        self._comprimir()
+        return json.dumps({
+            'compresion': self.compresion,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'centroides': [[round(m, 4), p] for m, p in self.centroides],
+        }, separators=(',', ':'))
+
+    @classmethod
+    def desde_json(cls, texto):
+        datos = json.loads(texto)
+        sketch = cls(datos['compresion'])
+        sketch.minimo = datos['minimo']
+        sketch.maximo = datos['maximo']
+        sketch.centroides = [list(c) for c in datos['centroides']]
+        return sketch
+
+
+def fusionar_sketches(textos, compresion=COMPRESION_DEFECTO):
+    """Fusiona varios sketches serializados en uno solo."""
+    resultado = TDigest(compresion)
+    for texto in textos:
+        resultado.fusionar(TDigest.desde_json(texto))
+    return resultado
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import pandas as pd
+
+import migrar_a_sqlite
+from publicar_snapshot import CONSULTAS
+
+# --- 1. CONFIGURACIÓN ---
+# Presupuestos guardados: escala de referencia, latencia máxima y plan capturado por consulta
+ARCHIVO_PRESUPUESTOS = 'presupuestos_planes.json'
+ESCALA_DEFECTO = 20      # Factor de réplica de las tablas de hechos
+REPETICIONES = 5         # Ejecuciones cronometradas por consulta (se usa la mediana)
+HOLGURA_PRESUPUESTO = 3  # Al actualizar: presupuesto = mediana medida x holgura
+PRESUPUESTO_MINIMO_MS = 5.0
+
+
+# --- 2. CONSTRUCCIÓN DEL DWH A ESCALA ---
+def escalar_tablas(tablas, escala):
+    """Replica las tablas de hechos 'escala' veces desplazando su llave (primera columna)."""
+    escaladas = {}
+    for nombre, df in tablas.items():
+        if not nombre.startswith('Fact_') or escala <= 1:
+            escaladas[nombre] = df
+            continue
+        llave = df.columns[0]
+        paso = int(df[llave].max())
+        copias = []
+        for i in range(escala):
+            copia = df.copy()
+            copia[llave] = copia[llave] + i * paso
+            copias.append(copia)
+        escaladas[nombre] = pd.concat(copias, ignore_index=True)
+    return escaladas
+
+def construir_dwh(archivo_db, escala):
+    """Construye el DWH con el mismo código de migrar_a_sqlite.py y los hechos escalados."""
+    tablas = escalar_tablas(migrar_a_sqlite.leer_csvs(), escala)
+    migrar_a_sqlite.migrar(archivo_db, tablas)
+    return {nombre: len(df) for nombre, df in tablas.items()}
+
+
+# --- 3. CAPTURA DE PLANES Y LATENCIAS ---
+def consultas_a_verificar(conn):
+    """Todas las vistas del DWH más las consultas que usa el dashboard al publicar."""
+    consultas = {}
+    for (vista,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view' ORDER BY name"):
+        consultas[f'vista:{vista}'] = f'SELECT * FROM "{vista}"'
+    for nombre, sql in CONSULTAS.items():
+        consultas[f'dashboard:{nombre}'] = sql
+    return consultas
+
+def alias_de_tablas(conn, sql):
+    """Mapa alias -> tablas de una consulta y de las vistas que usa (EXPLAIN muestra alias, no tablas).
+
+    Un alias puede apuntar a tablas distintas en vistas distintas: se guardan todas.
+    """
+    tablas = {nombre for (nombre,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    vistas = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'").fetchall())
+    alias = {nombre: {nombre} for nombre in tablas}
+    patron_objeto = re.compile(r'(?:FROM|JOIN)\s+"?(\w+)"?', re.IGNORECASE)
+    patron_alias = re.compile(r'(?:FROM|JOIN)\s+"?(\w+)"?\s+(?:AS\s+)?(\w+)', re.IGNORECASE)
+
+    pendientes, visitadas = [sql], set()
+    while pendientes:
+        texto = pendientes.pop()
+        for tabla, nombre_alias in patron_alias.findall(texto):
+            if tabla in tablas:
+                alias.setdefault(nombre_alias, set()).add(tabla)
+        for objeto in patron_objeto.findall(texto):
+            if objeto in vistas and objeto not in visitadas:
+                visitadas.add(objeto)
+                pendientes.append(vistas[objeto])
+    return alias
+
+def capturar_plan(conn, sql):
+    """Devuelve las líneas de EXPLAIN QUERY PLAN de la consulta."""
+    return [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+def medir_latencia_ms(conn, sql, repeticiones=REPETICIONES):
+    """Mediana en milisegundos de varias ejecuciones completas (tras una de calentamiento)."""
+    conn.execute(sql).fetchall()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.execute(sql).fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+def regresiones_de_plan(plan, alias):
+    """Detecta accesos a tablas de hechos que no buscan por partición.
+
+    Solo se acepta SEARCH con 'id_particion=?' como primera llave: un SCAN (aunque sea
+    de un índice cubriente) recorre las filas de todos los escenarios.
+    """
+    problemas = []
+    for linea in plan:
+        m = re.match(r'(SCAN|SEARCH) "?(\w+)"?(.*)', linea)
+        if not m:
+            continue
+        operacion, nombre, detalle = m.groups()
+        hechos = sorted(t for t in alias.get(nombre, {nombre}) if t.startswith('Fact_'))
+        if not hechos:
+            continue
+        tabla = '/'.join(hechos)
+        if 'AUTOMATIC' in detalle:
+            problemas.append(f"índice temporal sobre {tabla}: '{linea}'")
+        elif operacion == 'SCAN':
+            problemas.append(f"SCAN completo de {tabla}: '{linea}'")
+        elif '(id_particion=?' not in detalle:
+            problemas.append(f"búsqueda en {tabla} sin filtrar por partición: '{linea}'")
+    return problemas
+
+
+# --- 4. VERIFICACIÓN CONTRA PRESUPUESTOS ---
+def cargar_presupuestos():
+    """Lee los presupuestos guardados (None si aún no existen)."""
+    if not os.path.exists(ARCHIVO_PRESUPUESTOS):
+        return None
+    with open(ARCHIVO_PRESUPUESTOS, encoding='utf-8') as f:
+        return json.load(f)
+
+def guardar_presupuestos(escala, resultados):
+    """Guarda latencias con holgura y los planes medidos como nueva referencia."""
+    presupuestos = {
+        'escala': escala,
+        'consultas': {
+            nombre: {
+                'latencia_ms': max(round(r['latencia_ms'] * HOLGURA_PRESUPUESTO, 1), PRESUPUESTO_MINIMO_MS),
+                'plan': r['plan'],
+            }
+            for nombre, r in resultados.items()
+        },
+    }
+    with open(ARCHIVO_PRESUPUESTOS, 'w', encoding='utf-8') as f:
+        json.dump(presupuestos, f, indent=1, sort_keys=True, ensure_ascii=False)
+        f.write('\n')
+
+def verificar(escala, actualizar=False):
+    """Construye el DWH, mide cada consulta y devuelve la lista de fallos encontrados."""
+    presupuestos = cargar_presupuestos()
+    if presupuestos is None and not actualizar:
+        return [f"No existe '{ARCHIVO_PRESUPUESTOS}'. Ejecuta con --actualizar para crearlo."]
+
+    # Latencias medidas a otra escala no son comparables: pasarían o fallarían sin motivo real
+    if presupuestos is not None and not actualizar and presupuestos['escala'] != escala:
+        return [f"Los presupuestos se midieron a escala x{presupuestos['escala']}, no x{escala}. "
+                f"Usa --escala {presupuestos['escala']} o ejecuta con --actualizar para remedirlos."]
+
+    fallos = []
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo_db = os.path.join(directorio, 'dwh_escala.db')
+        filas = construir_dwh(archivo_db, escala)
+        print(f"\nDWH a escala x{escala}: " + ", ".join(f"{t}={n:,}" for t, n in filas.items() if t.startswith('Fact_')))
+
+        conn = sqlite3.connect(archivo_db)
+        try:
+            for nombre, sql in consultas_a_verificar(conn).items():
+                alias = alias_de_tablas(conn, sql)
+                plan = capturar_plan(conn, sql)
+                latencia = medir_latencia_ms(conn, sql)
+                resultados[nombre] = {'plan': plan, 'latencia_ms': latencia}
+
+                problemas = regresiones_de_plan(plan, alias)
+                plan_cambio = False
+                if not actualizar:
+                    guardado = presupuestos['consultas'].get(nombre)
+                    if guardado is None:
+                        problemas.append("consulta sin presupuesto (ejecuta con --actualizar)")
+                    else:
+                        if latencia > guardado['latencia_ms']:
+                            problemas.append(f"latencia {latencia:.1f} ms excede el presupuesto de {guardado['latencia_ms']:.1f} ms")
+                        plan_cambio = plan != guardado['plan']
+
+                estado = "OK" if not problemas else "FALLA"
+                print(f" -> {estado} {nombre}: {latencia:.1f} ms" + (" (el plan cambió respecto al guardado)" if plan_cambio else ""))
+                if problemas or plan_cambio:
+                    for linea in plan:
+                        print(f"      {linea}")
+                fallos.extend(f"{nombre}: {p}" for p in problemas)
+        finally:
+            conn.close()
+
+    if actualizar and not fallos:
+        guardar_presupuestos(escala, resultados)
+        print(f"\nPresupuestos guardados en '{ARCHIVO_PRESUPUESTOS}'.")
+    return fallos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica planes y latencias de las vistas y consultas del dashboard.")
+    parser.add_argument('--escala', type=int, default=None,
+                        help=f"Factor de réplica de los hechos (por defecto el guardado o {ESCALA_DEFECTO}).")
+    parser.add_argument('--actualizar', action='store_true',
+                        help="Reescribe los presupuestos con las mediciones actuales.")
+    args = parser.parse_args()
+
+    presupuestos = cargar_presupuestos()
+    escala = args.escala or (presupuestos or {}).get('escala', ESCALA_DEFECTO)
+
+    print("--- VERIFICANDO PLANES DE CONSULTA DEL DWH ---")
+    fallos = verificar(escala, actualizar=args.actualizar)
+    if fallos:
+        print("\n--- REGRESIONES DETECTADAS ---")
+        for fallo in fallos:
+            print(f" -> {fallo}")
+        sys.exit(1)
+    print("\n--- PLANES Y LATENCIAS DENTRO DE PRESUPUESTO ---")